@@ -1,7 +1,7 @@
 import itertools
 import sys
 
-safe_count = 0
+import numpy as np
 
 def check_safe(levels):
     already_increasing = None
@@ -17,14 +17,63 @@ def check_safe(levels):
             return False
     return True
 
-for report in sys.stdin:
-    levels = list(map(int, report.split()))
+def check_safe_with_removal_slow(levels):
     if check_safe(levels):
-        safe_count += 1
-        continue
+        return True
     for i in range(len(levels)):
         if check_safe(levels[0:i] + levels[(i + 1):]):
-            safe_count += 1
-            break
+            return True
+    return False
+
+def check_safe_with_removal(levels):
+    n = len(levels)
+    if n <= 2:
+        return True
+    for sign in (1, -1):
+        def good(a, b):
+            return 1 <= sign * (b - a) <= 3
+        # suffix[i]: levels[i:] is safe in this direction.
+        suffix = [True] * n
+        for i in range(n - 2, -1, -1):
+            suffix[i] = suffix[i + 1] and good(levels[i], levels[i + 1])
+        prefix = True  # levels[:i] is safe in this direction.
+        for i in range(n):
+            if prefix and (i == n - 1 or suffix[i + 1]) and (i == 0 or i == n - 1 or good(levels[i - 1], levels[i + 1])):
+                return True
+            if i > 0:
+                prefix = prefix and good(levels[i - 1], levels[i])
+            if not prefix:
+                break
+    return False
+
+for levels in ([7, 6, 4, 2, 1], [1, 2, 7, 8, 9], [9, 7, 6, 2, 1], [1, 3, 2, 4, 5], [8, 6, 4, 4, 1], [1, 3, 6, 7, 9], [5, 1, 2, 3], [1, 2, 3, 9], [3, 3], [1]):
+    assert check_safe_with_removal(levels) == check_safe_with_removal_slow(levels), levels
+
+def count_safe_with_removal(matrix):
+    rows, n = matrix.shape
+    if n <= 2:
+        return rows
+    safe = np.zeros(rows, dtype=bool)
+    ones = np.ones((rows, 1), dtype=bool)
+    for sign in (1, -1):
+        differences = sign * np.diff(matrix, axis=1)
+        good = (1 <= differences) & (differences <= 3)
+        skips = sign * (matrix[:, 2:] - matrix[:, :-2])
+        bridges = np.hstack((ones, (1 <= skips) & (skips <= 3), ones))
+        prefix = np.hstack((ones, np.logical_and.accumulate(good, axis=1)))
+        suffix = np.hstack((np.logical_and.accumulate(good[:, ::-1], axis=1)[:, ::-1], ones))
+        # Removing level i keeps the differences before i - 1 and after i,
+        # and bridges levels i - 1 and i + 1.
+        left = prefix[:, np.maximum(np.arange(n) - 1, 0)]
+        right = suffix[:, np.minimum(np.arange(n) + 1, n - 1)]
+        safe |= (left & right & bridges).any(axis=1)
+    return int(safe.sum())
+
+reports = {}
+for report in sys.stdin:
+    levels = list(map(int, report.split()))
+    reports.setdefault(len(levels), []).append(levels)
+
+safe_count = sum(count_safe_with_removal(np.array(levels, dtype=np.int64).reshape(len(levels), length)) for length, levels in reports.items())
 
 print(safe_count)
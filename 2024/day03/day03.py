@@ -1,15 +1,71 @@
-from pathlib import Path
+import itertools
+import mmap
 import re
 import sys
-with Path("input").open() as f:
-    data = str(f.read())
-
-pattern = re.compile(r"mul\((\d{1,3}),(\d{1,3})\)")
-result = sum(int(a) * int(b) for a, b in pattern.findall(data))
-print(f"Part 1: {result}")
-
-# (?s:.): dot matches all
-# (?:...): non-capturing parentheses
-pattern = re.compile(r"don't\(\)(?s:.)*?(?:do\(\)|$)|mul\((\d{1,3}),(\d{1,3})\)")
-result = sum(int(a) * int(b) for a, b in pattern.findall(data) if a)
-print(f"Part 2: {result}")
+
+def part1(data):
+    pattern = re.compile(r"mul\((\d{1,3}),(\d{1,3})\)")
+    return sum(int(a) * int(b) for a, b in pattern.findall(data))
+
+def part2(data):
+    # (?s:.): dot matches all
+    # (?:...): non-capturing parentheses
+    pattern = re.compile(r"don't\(\)(?s:.)*?(?:do\(\)|$)|mul\((\d{1,3}),(\d{1,3})\)")
+    return sum(int(a) * int(b) for a, b in pattern.findall(data) if a)
+
+TOKEN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+# A token that is cut by the end of a chunk is at most this long.
+MAX_PARTIAL_TOKEN = len("mul(123,456)") - 1
+
+def scan(chunks):
+    part1 = 0
+    part2 = 0
+    enabled = True
+    carry = b""
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            buffer = carry
+            cutoff = len(buffer)
+        else:
+            buffer = carry + chunk
+            cutoff = len(buffer) - MAX_PARTIAL_TOKEN
+        consumed = 0
+        for match in TOKEN.finditer(buffer):
+            if match.start() >= cutoff:
+                break
+            token = match.group()
+            if token == b"do()":
+                enabled = True
+            elif token == b"don't()":
+                enabled = False
+            else:
+                product = int(match.group(1)) * int(match.group(2))
+                part1 += product
+                if enabled:
+                    part2 += product
+            consumed = match.end()
+        carry = buffer[max(consumed, cutoff, 0):]
+    return part1, part2
+
+def read_chunks(file, chunk_size=1 << 20):
+    return iter(lambda: file.read(chunk_size), b"")
+
+example1 = "xmul(2,4)%&mul[3,7]!@^do_not_mul(5,5)+mul(32,64]then(mul(11,8)mul(8,5))"
+example2 = "xmul(2,4)&mul[3,7]!^don't()_mul(5,5)+mul(32,64](mul(11,8)undo()?mul(8,5))"
+for chunk_size in range(1, 20):
+    chunks = [example2[i:i + chunk_size].encode() for i in range(0, len(example2), chunk_size)]
+    assert scan(chunks) == (part1(example2), part2(example2)) == (161, 48)
+assert scan([example1.encode()])[0] == part1(example1) == 161
+
+def open_input():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return mmap.mmap(sys.stdin.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return sys.stdin.buffer
+
+result1, result2 = scan(read_chunks(open_input()))
+print(f"Part 1: {result1}")
+print(f"Part 2: {result2}")
@@ -1,5 +1,7 @@
 import sys
 
+import numpy as np
+
 lines = list(sys.stdin)
 
 def count_xmas_at_point(grid, y, x) -> int:
@@ -16,7 +18,7 @@ def count_xmas_at_point(grid, y, x) -> int:
     return count
 
 def x_mas_at_point(grid, y, x) -> bool:
-    if grid[y][x] != "A" or y < 1 or x < 1 or y >= len(grid) - 1 or x >= len(grid) - 1:
+    if grid[y][x] != "A" or y < 1 or x < 1 or y >= len(grid) - 1 or x >= len(grid[0]) - 1:
         return False
     if "".join(grid[y + i][x + i] for i in range(-1, 2)) not in { "MAS", "SAM" }:
         return False
@@ -24,6 +26,53 @@ def x_mas_at_point(grid, y, x) -> bool:
         return False
     return True
 
-print(f"Part 1: {sum(count_xmas_at_point(lines, i, j) for i in range(len(lines)) for j in range(len(lines[0])))}")
+#print(f"Part 1: {sum(count_xmas_at_point(lines, i, j) for i in range(len(lines)) for j in range(len(lines[0])))}")
+
+#print(f"Part 2: {sum(1 for i in range(len(lines)) for j in range(len(lines[0])) if x_mas_at_point(lines, i, j))}")
+
+
+DIRECTIONS = [(dx, dy) for dy in range(-1, 2) for dx in range(-1, 2) if (dx, dy) != (0, 0)]
+
+def load_grid(lines):
+    lines = [line.rstrip("\n") for line in lines]
+    width = max(len(line) for line in lines)
+    return np.frombuffer("".join(line.ljust(width) for line in lines).encode(), dtype=np.uint8).reshape(len(lines), width)
+
+def shifted(grid, y0, x0, height, width):
+    return grid[y0:y0 + height, x0:x0 + width]
+
+def line_matches(grid, word, dx, dy, margin_before, margin_after):
+    height, width = grid.shape
+    ys, xs = margin_before
+    ye, xe = margin_after
+    mask = np.ones((height - ys - ye, width - xs - xe), dtype=bool)
+    for i, c in enumerate(word.encode()):
+        mask &= shifted(grid, ys + i * dy, xs + i * dx, *mask.shape) == c
+    return mask
+
+def count_words(grid, words):
+    counts = {}
+    for word in words:
+        length = len(word) - 1
+        count = 0
+        for dx, dy in DIRECTIONS:
+            before = (max(0, -length * dy), max(0, -length * dx))
+            after = (max(0, length * dy), max(0, length * dx))
+            if before[0] + after[0] < grid.shape[0] and before[1] + after[1] < grid.shape[1]:
+                count += int(line_matches(grid, word, dx, dy, before, after).sum())
+        counts[word] = count
+    return counts
+
+def count_crosses(grid, word):
+    assert len(word) % 2 == 1
+    k = len(word) // 2
+    if 2 * k >= min(grid.shape):
+        return 0
+    diagonal = line_matches(grid, word, 1, 1, (0, 0), (2 * k, 2 * k)) | line_matches(grid, word[::-1], 1, 1, (0, 0), (2 * k, 2 * k))
+    # The anti-diagonal starts at the top-right corner of each window.
+    anti_diagonal = line_matches(grid, word, -1, 1, (0, 2 * k), (2 * k, 0)) | line_matches(grid, word[::-1], -1, 1, (0, 2 * k), (2 * k, 0))
+    return int((diagonal & anti_diagonal).sum())
 
-print(f"Part 2: {sum(1 for i in range(len(lines)) for j in range(len(lines[0])) if x_mas_at_point(lines, i, j))}")
+grid = load_grid(lines)
+print(f"Part 1: {count_words(grid, ['XMAS'])['XMAS']}")
+print(f"Part 2: {count_crosses(grid, 'MAS')}")
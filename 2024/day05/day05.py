@@ -1,3 +1,5 @@
+import functools
+import itertools
 import sys
 
 lines = list(sys.stdin)
@@ -19,7 +21,7 @@ def in_order(ordering, update):
 def middle_element(array):
     return array[len(array) >> 1]
 
-print(f"Part 1: {sum([middle_element(update) for update in updates if in_order(ordering, update)])}")
+#print(f"Part 1: {sum([middle_element(update) for update in updates if in_order(ordering, update)])}")
 
 def add_to_updated(precedences, updated, update, page):
     if page in updated:
@@ -43,4 +45,35 @@ def sort_order(precedences, update):
 
 precedences = get_precedences(ordering)
 
-print(f"Part 2: {sum([middle_element(sort_order(precedences, update)) for update in updates if not in_order(ordering, update)])}")
+#print(f"Part 2: {sum([middle_element(sort_order(precedences, update)) for update in updates if not in_order(ordering, update)])}")
+
+# The rules are assumed to order every pair of pages that appear together
+# in an update, so checking adjacent pages is enough.
+
+def compile_rules(ordering):
+    return {(u, v) for u, v in ordering}
+
+def in_order_fast(rules, update):
+    return all((b, a) not in rules for a, b in itertools.pairwise(update))
+
+def sort_update(rules, update):
+    def compare(a, b):
+        if (a, b) in rules:
+            return -1
+        if (b, a) in rules:
+            return 1
+        return 0
+    return sorted(update, key=functools.cmp_to_key(compare))
+
+rules = compile_rules(ordering)
+
+part1 = 0
+part2 = 0
+for update in updates:
+    if in_order_fast(rules, update):
+        part1 += middle_element(update)
+    else:
+        part2 += middle_element(sort_update(rules, update))
+
+print(f"Part 1: {part1}")
+print(f"Part 2: {part2}")
@@ -1,32 +1,11 @@
+import argparse
+import array
+import multiprocessing
 import sys
 
-grid = list(sys.stdin)
-
-initial_position = next((x, y) for y, line in enumerate(grid) for x, symbol in enumerate(line) if symbol == "^")
-
-dx, dy = (0, -1)
-
-position = initial_position
-visited = { position }
-
 def inside(grid, x, y):
     return 0 <= x < len(grid[0]) and 0 <= y < len(grid)
 
-while True:
-    x, y = position
-    nx, ny = x + dx, y + dy
-    if not inside(grid, nx, ny):
-        break
-    if grid[ny][nx] == "#":
-        dx, dy = - dy, dx
-        continue
-    position = nx, ny
-    visited.add(position)
-
-print(f"Part 1: {len(visited)}")
-
-grid = list(map(list, grid))
-
 def test_obstruction(grid, ox, oy):
     grid[oy][ox] = "#"
     position = initial_position
@@ -50,8 +29,6 @@ def test_obstruction(grid, ox, oy):
     grid[oy][ox] = "."
     return in_loop
 
-#print(f"Part 2: {sum(1 for ox, oy in visited if test_obstruction(grid, ox, oy) )}")
-
 def add_obstacle_to_compressed_grid(grid, compressed, ox, oy):
     undo = []
     for dy in range(-1, 2):
@@ -97,6 +74,130 @@ def fast_test_obstruction(grid, compressed, ox, oy):
         compressed[y][x][(dx, dy)] = value
     return in_loop
 
-compressed = compress_grid(grid)
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+def build_jump_tables(grid):
+    width = sum(1 for symbol in grid[0] if symbol != "\n")
+    height = len(grid)
+    jumps = []
+    for dx, dy in DIRECTIONS:
+        jump = array.array("i", [-1]) * (width * height)
+        xs = range(width - 1, -1, -1) if dx > 0 else range(width)
+        ys = range(height - 1, -1, -1) if dy > 0 else range(height)
+        for y in ys:
+            for x in xs:
+                if grid[y][x] == "#":
+                    continue
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                if grid[ny][nx] == "#":
+                    jump[y * width + x] = y * width + x
+                else:
+                    jump[y * width + x] = jump[ny * width + nx]
+        jumps.append(jump)
+    return width, height, jumps
+
+def next_state(jumps, width, state, ox, oy):
+    cell, direction = divmod(state, 4)
+    stop = jumps[direction][cell]
+    dx, dy = DIRECTIONS[direction]
+    x, y = cell % width, cell // width
+    if (ox - x) * dy == (oy - y) * dx:
+        distance = (ox - x) * dx + (oy - y) * dy
+        if distance > 0 and (stop == -1 or distance <= (stop % width - x) * dx + (stop // width - y) * dy):
+            stop = (oy - dy) * width + ox - dx
+    if stop == -1:
+        return -1
+    return stop * 4 + (direction + 1) % 4
+
+def engine_test_obstruction(jumps, width, start, ox, oy):
+    # Brent's cycle detection over (cell, direction) states.
+    power = length = 1
+    tortoise = start
+    hare = next_state(jumps, width, start, ox, oy)
+    while hare != tortoise:
+        if hare == -1:
+            return False
+        if power == length:
+            tortoise = hare
+            power *= 2
+            length = 0
+        hare = next_state(jumps, width, hare, ox, oy)
+        length += 1
+    return True
+
+engine = None
+
+def init_engine_worker(width, jumps):
+    global engine
+    engine = width, jumps
+
+def engine_worker(candidate):
+    width, jumps = engine
+    ox, oy, start = candidate
+    return engine_test_obstruction(jumps, width, start, ox, oy)
+
+def count_loop_obstructions(grid, path, first_visit, processes=None):
+    width, height, jumps = build_jump_tables(grid)
+    candidates = []
+    steps_saved = 0
+    for (ox, oy), index in first_visit.items():
+        if not (0 <= ox < width and 0 <= oy < height):
+            continue
+        # The guard follows the original path until it first steps onto
+        # the obstruction, so start from the state just before that.
+        index = max(index - 1, 0)
+        (x, y), direction = path[index]
+        start = (y * width + x) * 4 + DIRECTIONS.index(direction)
+        candidates.append((ox, oy, start))
+        steps_saved += index
+    if processes == 1:
+        init_engine_worker(width, jumps)
+        return sum(map(engine_worker, candidates)), steps_saved
+    with multiprocessing.Pool(processes, init_engine_worker, (width, jumps)) as pool:
+        return sum(pool.imap_unordered(engine_worker, candidates, chunksize=256)), steps_saved
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+
+    grid = list(sys.stdin)
+
+    initial_position = next((x, y) for y, line in enumerate(grid) for x, symbol in enumerate(line) if symbol == "^")
+
+    dx, dy = (0, -1)
+
+    position = initial_position
+    visited = { position }
+    path = [(position, (dx, dy))]
+    first_visit = { position: 0 }
+
+    while True:
+        x, y = position
+        nx, ny = x + dx, y + dy
+        if not inside(grid, nx, ny):
+            break
+        if grid[ny][nx] == "#":
+            dx, dy = - dy, dx
+            path.append((position, (dx, dy)))
+            continue
+        position = nx, ny
+        visited.add(position)
+        path.append((position, (dx, dy)))
+        first_visit.setdefault(position, len(path) - 1)
+
+    print(f"Part 1: {len(visited)}")
+
+    grid = list(map(list, grid))
+
+    #print(f"Part 2: {sum(1 for ox, oy in visited if test_obstruction(grid, ox, oy) )}")
+
+    compressed = compress_grid(grid)
+
+    #print(f"Part 2: {sum(1 for ox, oy in visited if fast_test_obstruction(grid, compressed, ox, oy) )}")
 
-print(f"Part 2: {sum(1 for ox, oy in visited if fast_test_obstruction(grid, compressed, ox, oy) )}")
+    loop_obstructions, steps_saved = count_loop_obstructions(grid, path, first_visit, args.processes)
+    print(f"Steps saved: {steps_saved}", file=sys.stderr)
+    print(f"Part 2: {loop_obstructions}")
@@ -16,7 +16,7 @@ def could_be_true(equation, ops):
         possible_values = { op(possible, value) for possible in possible_values for op in ops }
     return test_value in possible_values
 
-print(f"Part 1: {sum(equation[0] for equation in equations if could_be_true(equation, [lambda x, y: x + y, lambda x, y: x * y ]))}")
+#print(f"Part 1: {sum(equation[0] for equation in equations if could_be_true(equation, [lambda x, y: x + y, lambda x, y: x * y ]))}")
 
 #print(f"Part 2: {sum(equation[0] for equation in equations if could_be_true(equation, [lambda x, y: x + y, lambda x, y: x * y, lambda x, y: int(str(x) + str(y))]))}")
 
@@ -39,4 +39,64 @@ def deconcat(x, y):
     if len(sx) > len(sy) and sx.endswith(sy):
         return int(sx.removesuffix(sy))
 
-print(f"Part 2: {sum(equation[0] for equation in equations if could_be_true_faster(equation, [lambda x, y: x - y if x >= y else None, lambda x, y: x // y if x % y == 0 else None, deconcat]))}")
+#print(f"Part 2: {sum(equation[0] for equation in equations if could_be_true_faster(equation, [lambda x, y: x - y if x >= y else None, lambda x, y: x // y if x % y == 0 else None, deconcat]))}")
+
+# Each operator is given by its inverse: knowing the result [target] and the
+# right operand [value] (with [power] the smallest power of ten above it),
+# return the left operand, or None if there is none.
+
+def undo_add(target, value, power):
+    if target >= value:
+        return target - value
+
+def undo_multiply(target, value, power):
+    if value != 0 and target % value == 0:
+        return target // value
+
+def undo_concat(target, value, power):
+    if target > value and (target - value) % power == 0:
+        return (target - value) // power
+
+def power_above(value):
+    power = 10
+    while power <= value:
+        power *= 10
+    return power
+
+assert undo_concat(156, 6, power_above(6)) == 15
+assert undo_concat(6, 6, power_above(6)) is None
+assert undo_concat(1006, 6, power_above(6)) == 100
+
+def solve(equation, undo_ops):
+    test_value, numbers = equation
+    powers = [power_above(value) for value in numbers]
+    nodes = 0
+
+    def search(target, i):
+        nonlocal nodes
+        nodes += 1
+        if i == 0:
+            return target == numbers[0]
+        for undo in undo_ops:
+            previous = undo(target, numbers[i], powers[i])
+            if previous is not None and search(previous, i - 1):
+                return True
+        return False
+
+    return search(test_value, len(numbers) - 1), nodes
+
+def total_calibration(equations, undo_ops):
+    total = 0
+    total_nodes = 0
+    for equation in equations:
+        possible, nodes = solve(equation, undo_ops)
+        if possible:
+            total += equation[0]
+        total_nodes += nodes
+    return total, total_nodes
+
+part1, nodes1 = total_calibration(equations, [undo_add, undo_multiply])
+print(f"Part 1: {part1}")
+part2, nodes2 = total_calibration(equations, [undo_add, undo_multiply, undo_concat])
+print(f"Part 2: {part2}")
+print(f"Nodes explored: {nodes1} (Part 1), {nodes2} (Part 2)", file=sys.stderr)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import heapq
 import itertools
+import mmap
 import sys
-data = sys.stdin.read().strip()
 
 @dataclass(slots=True)
 class Checksum:
@@ -13,24 +14,25 @@ class Checksum:
         self.checksum += id * (2 * self.position + length - 1) * length // 2
         self.position += length
 
-initial, *tail = map(int, data)
-blocks = list(enumerate(itertools.batched(tail, 2), start=1))
-last_id, (last_free, last_length) = blocks.pop()
-checksum = Checksum(position=initial)
-while len(blocks) >= 1:
-    current_id, (current_free, current_length) = blocks.pop(0)
-    while current_free > 0 and last_length > 0:
-        count = min(current_free, last_length)
-        checksum.add(last_id, count)
-        current_free -= count
-        last_length -= count
-        if last_length == 0:
-            if len(blocks) == 0:
-                break
-            last_id, (last_free, last_length) = blocks.pop()
-    checksum.add(current_id, current_length)
-checksum.add(last_id, last_length)
-print(f"Part 1: {checksum.checksum}")
+def part1(data):
+    initial, *tail = map(int, data)
+    blocks = list(enumerate(itertools.batched(tail, 2), start=1))
+    last_id, (last_free, last_length) = blocks.pop()
+    checksum = Checksum(position=initial)
+    while len(blocks) >= 1:
+        current_id, (current_free, current_length) = blocks.pop(0)
+        while current_free > 0 and last_length > 0:
+            count = min(current_free, last_length)
+            checksum.add(last_id, count)
+            current_free -= count
+            last_length -= count
+            if last_length == 0:
+                if len(blocks) == 0:
+                    break
+                last_id, (last_free, last_length) = blocks.pop()
+        checksum.add(current_id, current_length)
+    checksum.add(last_id, last_length)
+    return checksum.checksum
 
 @dataclass(slots=True)
 class Block:
@@ -40,48 +42,117 @@ class Block:
     previous: Block
     next: Block
 
-initial, *tail = map(int, data)
+def part2(data):
+    initial, *tail = map(int, data)
+
+    first = Block(0, 0, initial, None, None)
+    previous = first
+    for id, (free, length) in enumerate(itertools.batched(tail, 2), start=1):
+        block = Block(id, free, length, previous, None)
+        previous.next = block
+        previous = block
+
+    while block:
+        target = first
+        while target.free < block.length:
+            if target.id == block.id:
+                target = None
+                break
+            target = target.next
+        previous = block.previous
+        if target:
+            if target.id != block.id:
+                next = block.next
+                block.previous.next = next
+                if next:
+                    next.previous = block.previous
+                    next.free += block.free + block.length
+                target.previous.next = block
+                block.previous = target.previous
+                target.previous = block
+                block.next = target
+                target.free -= block.length
+            elif block.next:
+                block.next.free += block.free
+            block.free = 0
+        block = previous
+
+    checksum = Checksum(position=initial)
+    block = first
+    while block.next:
+        block = block.next
+        checksum.position += block.free
+        checksum.add(block.id, block.length)
+    return checksum.checksum
+
+def open_disk_map(file):
+    try:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        buffer = file.buffer.read()
+    length = len(buffer)
+    while length > 0 and buffer[length - 1] in b" \r\n":
+        length -= 1
+    return memoryview(buffer)[:length]
+
+def streaming_part1(digits):
+    checksum = Checksum()
+    back = len(digits) - 1 - (len(digits) - 1) % 2
+    back_left = digits[back] - 48
+    front = 0
+    while front < back:
+        if front % 2 == 0:
+            checksum.add(front // 2, digits[front] - 48)
+        else:
+            free = digits[front] - 48
+            while free > 0 and front < back:
+                count = min(free, back_left)
+                checksum.add(back // 2, count)
+                free -= count
+                back_left -= count
+                if back_left == 0:
+                    back -= 2
+                    back_left = digits[back] - 48
+        front += 1
+    if front == back:
+        checksum.add(back // 2, back_left)
+    return checksum.checksum
+
+assert streaming_part1(b"2333133121414131402") == part1("2333133121414131402") == 1928
+assert streaming_part1(b"12345") == part1("12345") == 60
 
-first = Block(0, 0, initial, None, None)
-previous = first
-for id, (free, length) in enumerate(itertools.batched(tail, 2), start=1):
-    block = Block(id, free, length, previous, None)
-    previous.next = block
-    previous = block
+def compact_files(digits):
+    initial, *tail = digits
+    files = [(0, initial)]
+    gaps = [[] for _ in range(10)]
+    position = initial
+    for free, length in itertools.batched(tail, 2):
+        if free > 0:
+            gaps[free].append(position)
+        position += free
+        files.append((position, length))
+        position += length
+    for heap in gaps:
+        heapq.heapify(heap)
+    checksum = Checksum()
+    for id in range(len(files) - 1, -1, -1):
+        position, length = files[id]
+        best = None
+        for size in range(length, 10):
+            if gaps[size] and gaps[size][0] < position and (best is None or gaps[size][0] < gaps[best][0]):
+                best = size
+        if best is not None:
+            position = heapq.heappop(gaps[best])
+            if best > length:
+                heapq.heappush(gaps[best - length], position + length)
+        checksum.position = position
+        checksum.add(id, length)
+    return checksum.checksum
 
-while block:
-    target = first
-    while target.free < block.length:
-        if target.id == block.id:
-            target = None
-            break
-        target = target.next
-    previous = block.previous
-    if target:
-        if target.id != block.id:
-            next = block.next
-            block.previous.next = next
-            if next:
-                next.previous = block.previous
-                next.free += block.free + block.length
-            target.previous.next = block
-            block.previous = target.previous
-            target.previous = block
-            block.next = target
-            target.free -= block.length
-        elif block.next:
-            block.next.free += block.free
-        block.free = 0
-    block = previous
+digits = open_disk_map(sys.stdin)
+print(f"Part 1: {streaming_part1(digits)}")
+print(f"Part 2: {compact_files(digit - 48 for digit in digits)}")
 
-checksum = Checksum(position=initial)
-block = first
-while block.next:
-    block = block.next
-    checksum.position += block.free
-    checksum.add(block.id, block.length)
-print(f"Part 2: {checksum.checksum}")
-    
 
 #blocks = list(enumerate(itertools.batched(tail, 2), start=1))
 #checksum = Checksum(position=initial)
@@ -17,6 +17,33 @@ def find_paths(initial, empty, add):
         positions = new_positions
     return positions
 
-print(f"Part 1: {sum(len(find_paths({(ox, oy)}, lambda: set(), lambda s, e: s.add(e))) for oy in range(len(lines)) for ox in range(len(lines[0])) if lines[oy][ox] == "0")}")
+#print(f"Part 1: {sum(len(find_paths({(ox, oy)}, lambda: set(), lambda s, e: s.add(e))) for oy in range(len(lines)) for ox in range(len(lines[0])) if lines[oy][ox] == "0")}")
 
-print(f"Part 2: {len(find_paths([(ox, oy) for oy in range(len(lines)) for ox in range(len(lines[0])) if lines[oy][ox] == "0"], lambda: [], lambda l, e: l.append(e)))}")
+#print(f"Part 2: {len(find_paths([(ox, oy) for oy in range(len(lines)) for ox in range(len(lines[0])) if lines[oy][ox] == "0"], lambda: [], lambda l, e: l.append(e)))}")
+
+def trail_scores(lines):
+    width = len(lines[0])
+    heights = [int(c) if c.isdigit() else -1 for line in lines for c in line]
+    layers = [[] for _ in range(10)]
+    for cell, height in enumerate(heights):
+        if height >= 0:
+            layers[height].append(cell)
+    peaks = [0] * len(heights)
+    ratings = [0] * len(heights)
+    for i, cell in enumerate(layers[9]):
+        peaks[cell] = 1 << i
+        ratings[cell] = 1
+    for height in range(8, -1, -1):
+        for cell in layers[height]:
+            x = cell % width
+            for neighbor in (cell - width, cell + width, cell - 1 if x > 0 else -1, cell + 1 if x + 1 < width else -1):
+                if 0 <= neighbor < len(heights) and heights[neighbor] == height + 1:
+                    peaks[cell] |= peaks[neighbor]
+                    ratings[cell] += ratings[neighbor]
+    score = sum(peaks[cell].bit_count() for cell in layers[0])
+    rating = sum(ratings[cell] for cell in layers[0])
+    return score, rating
+
+score, rating = trail_scores(lines)
+print(f"Part 1: {score}")
+print(f"Part 2: {rating}")
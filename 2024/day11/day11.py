@@ -1,5 +1,10 @@
+import bisect
+import json
+import pathlib
 import sys
 
+import numpy as np
+
 values = list(map(int, sys.stdin.read().split()))
 
 def blink(stones):
@@ -16,10 +21,10 @@ def blink(stones):
                 new_stones.append(stone * 2024)
     return new_stones
 
-stones = values
-for _ in range(25):
-    stones = blink(stones)
-print(f"Part 1: {len(stones)}")
+#stones = values
+#for _ in range(25):
+#    stones = blink(stones)
+#print(f"Part 1: {len(stones)}")
 
 def add_stone(stones, number, count):
     stones[number] = stones.get(number, 0) + count
@@ -38,10 +43,105 @@ def faster_blink(stones):
                 add_stone(new_stones, stone * 2024, count)
     return new_stones
 
-stones = {}
-for stone in values:
-    add_stone(stones, stone, 1)
-for _ in range(75):
+#stones = {}
+#for stone in values:
+#    add_stone(stones, stone, 1)
+#for _ in range(75):
+#    stones = faster_blink(stones)
+#
+#print(f"Part 2: {sum(stones.values())}")
+
+POWERS_OF_TEN = [10]
+
+def digit_count(stone):
+    while POWERS_OF_TEN[-1] <= stone:
+        POWERS_OF_TEN.append(POWERS_OF_TEN[-1] * 10)
+    return bisect.bisect_right(POWERS_OF_TEN, stone) + 1
+
+def successors(stone):
+    if stone == 0:
+        return (1,)
+    digits = digit_count(stone)
+    if digits % 2 == 0:
+        return divmod(stone, 10 ** (digits // 2))
+    return (stone * 2024,)
+
+assert successors(1000) == (10, 0)
+assert successors(99) == (9, 9)
+assert successors(999) == (999 * 2024,)
+assert successors(10 ** 45 + 7) == (10 ** 22, 7)
+
+CACHE_PATH = pathlib.Path(__file__).with_name("transitions.json")
+
+# Tables written before stones of 40 digits or more were split correctly
+# have no version and are discarded.
+CACHE_VERSION = 2
+
+class StoneEngine:
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = cache_path
+        self.table = {}
+        if cache_path is not None and cache_path.exists():
+            with cache_path.open() as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.table = {int(stone): tuple(next_stones) for stone, next_stones in cache["transitions"].items()}
+        self.dirty = False
+
+    def successors(self, stone):
+        next_stones = self.table.get(stone)
+        if next_stones is None:
+            next_stones = successors(stone)
+            self.table[stone] = next_stones
+            self.dirty = True
+        return next_stones
+
+    def save(self):
+        if self.cache_path is not None and self.dirty:
+            with self.cache_path.open("w") as f:
+                transitions = {str(stone): next_stones for stone, next_stones in self.table.items()}
+                json.dump({"version": CACHE_VERSION, "transitions": transitions}, f)
+            self.dirty = False
+
+    def closure(self, stones):
+        ids = {}
+        order = []
+        pending = list(stones)
+        while pending:
+            stone = pending.pop()
+            if stone in ids:
+                continue
+            ids[stone] = len(order)
+            order.append(stone)
+            pending.extend(self.successors(stone))
+        sources = []
+        targets = []
+        for stone in order:
+            for next_stone in self.successors(stone):
+                sources.append(ids[stone])
+                targets.append(ids[next_stone])
+        return ids, np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
+
+    def count_after(self, stones, blinks):
+        ids, sources, targets = self.closure(stones)
+        counts = np.zeros(len(ids), dtype=object)
+        for stone in stones:
+            counts[ids[stone]] += 1
+        for _ in range(blinks):
+            next_counts = np.zeros(len(ids), dtype=object)
+            np.add.at(next_counts, targets, counts[sources])
+            counts = next_counts
+        return int(counts.sum())
+
+large_stone = int("1234567890" * 4 + "12345")
+stones = {large_stone: 1}
+for _ in range(10):
     stones = faster_blink(stones)
+assert StoneEngine(cache_path=None).count_after([large_stone], 10) == sum(stones.values()) == 56
 
-print(f"Part 2: {sum(stones.values())}")
+engine = StoneEngine()
+assert engine.count_after([125, 17], 6) == 22
+assert engine.count_after([125, 17], 25) == 55312
+print(f"Part 1: {engine.count_after(values, 25)}")
+print(f"Part 2: {engine.count_after(values, 75)}")
+engine.save()
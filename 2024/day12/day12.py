@@ -7,7 +7,7 @@ NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
 def inside(grid, x, y):
     return 0 <= x < len(grid[0]) and 0 <= y < len(grid)
 
-def fill_region(grid, x, y):
+def fill_region(grid, region_grid, x, y):
     name = grid[y][x]
     points = []
     region = []
@@ -26,54 +26,121 @@ def fill_region(grid, x, y):
         new_points = next_points
     return region
 
-regions = []
-region_grid = [[None for _ in range(len(grid[0]))] for _ in range(len(grid))]
-for y in range(len(grid)):
-    for x in range(len(grid[0])):
-        if region_grid[y][x] == None:
-            regions.append(fill_region(grid, x, y))
+def fill_regions(grid):
+    regions = []
+    region_grid = [[None for _ in range(len(grid[0]))] for _ in range(len(grid))]
+    for y in range(len(grid)):
+        for x in range(len(grid[0])):
+            if region_grid[y][x] == None:
+                regions.append(fill_region(grid, region_grid, x, y))
+    return regions
 
-s = 0
-for region in regions:
-    area = len(region)
-    perimeter = 0
-    for (x, y) in region:
-        plots = 4
-        for (dx, dy) in NEIGHBORS:
-            nx = x + dx
-            ny = y + dy
-            if (nx, ny) in region:
-                plots -= 1
-        perimeter += plots
-    s += area * perimeter
+def part1(regions):
+    s = 0
+    for region in regions:
+        area = len(region)
+        perimeter = 0
+        for (x, y) in region:
+            plots = 4
+            for (dx, dy) in NEIGHBORS:
+                nx = x + dx
+                ny = y + dy
+                if (nx, ny) in region:
+                    plots -= 1
+            perimeter += plots
+        s += area * perimeter
+    return s
+
+#print(f"Part 1: {part1(fill_regions(grid))}")
+
+def part2(regions):
+    s = 0
+    for region in regions:
+        area = len(region)
+        perimeter = 0
+        fences_grid = [[{ direction: False for direction in NEIGHBORS } for _ in range(len(grid[0]))] for _ in range(len(grid))]
+        for (x, y) in region:
+            plant_fence_count = 0
+            plant_fences = fences_grid[y][x]
+            for (dx, dy) in NEIGHBORS:
+                if (x + dx, y + dy) not in region and not plant_fences[(dx, dy)]:
+                    plant_fence_count += 1
+                    plant_fences[(dx, dy)] = True
+                    fx = x - dy
+                    fy = y - dx
+                    while (fx, fy) in region and (fx + dx, fy + dy) not in region:
+                        fences_grid[fy][fx][(dx, dy)] = True
+                        fx = fx - dy
+                        fy = fy - dx
+                    fx = x + dy
+                    fy = y + dx
+                    while (fx, fy) in region and (fx + dx, fy + dy) not in region:
+                        fences_grid[fy][fx][(dx, dy)] = True
+                        fx = fx + dy
+                        fy = fy + dx
+            perimeter += plant_fence_count
+        s += area * perimeter
+    return s
 
-print(f"Part 1: {s}")
+#print(f"Part 2: {part2(fill_regions(grid))}")
+
+def find(parents, cell):
+    while parents[cell] != cell:
+        parents[cell] = parents[parents[cell]]
+        cell = parents[cell]
+    return cell
+
+def label_regions(grid):
+    width = len(grid[0])
+    height = len(grid)
+    plants = "".join(grid)
+    parents = list(range(width * height))
+    for y in range(height):
+        for x in range(width):
+            cell = y * width + x
+            if x + 1 < width and plants[cell + 1] == plants[cell]:
+                parents[find(parents, cell + 1)] = find(parents, cell)
+            if y + 1 < height and plants[cell + width] == plants[cell]:
+                parents[find(parents, cell + width)] = find(parents, cell)
+    return [find(parents, cell) for cell in range(width * height)]
+
+def region_measures(grid):
+    width = len(grid[0])
+    height = len(grid)
+    labels = label_regions(grid)
+    areas = [0] * (width * height)
+    perimeters = [0] * (width * height)
+    sides = [0] * (width * height)
+
+    def label(x, y):
+        if 0 <= x < width and 0 <= y < height:
+            return labels[y * width + x]
+        return -1
+
+    for y in range(height):
+        for x in range(width):
+            region = labels[y * width + x]
+            areas[region] += 1
+            for (dx, dy) in NEIGHBORS:
+                if label(x + dx, y + dy) != region:
+                    perimeters[region] += 1
+    # Each region has as many sides as corners, and corners are found by
+    # looking at every 2x2 window of the padded grid.
+    for y in range(-1, height):
+        for x in range(-1, width):
+            window = (label(x, y), label(x + 1, y), label(x, y + 1), label(x + 1, y + 1))
+            for region in set(window):
+                if region < 0:
+                    continue
+                owned = [cell == region for cell in window]
+                count = sum(owned)
+                if count == 1 or count == 3:
+                    sides[region] += 1
+                elif count == 2 and owned[0] == owned[3]:
+                    sides[region] += 2
+    regions = sorted(set(labels))
+    return [(areas[region], perimeters[region], sides[region]) for region in regions]
 
-s = 0
-for region in regions:
-    area = len(region)
-    perimeter = 0
-    fences_grid = [[{ direction: False for direction in NEIGHBORS } for _ in range(len(grid[0]))] for _ in range(len(grid))]
-    for (x, y) in region:
-        plant_fence_count = 0
-        plant_fences = fences_grid[y][x]
-        for (dx, dy) in NEIGHBORS:
-            if (x + dx, y + dy) not in region and not plant_fences[(dx, dy)]:
-                plant_fence_count += 1
-                plant_fences[(dx, dy)] = True
-                fx = x - dy
-                fy = y - dx
-                while (fx, fy) in region and (fx + dx, fy + dy) not in region:
-                    fences_grid[fy][fx][(dx, dy)] = True
-                    fx = fx - dy
-                    fy = fy - dx
-                fx = x + dy
-                fy = y + dx
-                while (fx, fy) in region and (fx + dx, fy + dy) not in region:
-                    fences_grid[fy][fx][(dx, dy)] = True
-                    fx = fx + dy
-                    fy = fy + dx
-        perimeter += plant_fence_count
-    s += area * perimeter
-    
-print(f"Part 2: {s}")
+measures = region_measures(grid)
+print(f"Part 1: {sum(area * perimeter for area, perimeter, _ in measures)}")
+print(f"Part 2: {sum(area * side_count for area, _, side_count in measures)}")
@@ -1,19 +1,24 @@
+import argparse
 import math
 import re
 import statistics
 import sys
 
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument("width", type=int, nargs="?", default=101)
+parser.add_argument("height", type=int, nargs="?", default=103)
+args = parser.parse_args()
+
 re_robot = re.compile(r"p=(\d+),(\d+) v=(-?\d+),(-?\d+)")
 robots = []
 for line in sys.stdin:
     px, py, vx, vy = re_robot.match(line).groups()
     robots.append((int(px), int(py), int(vx), int(vy)))
 
-width = 101
-height = 103
-
-#width = 11
-#height = 7
+width = args.width
+height = args.height
 
 seconds = 100
 quadrants = [[0 for _ in range(2)] for _ in range(2)]
@@ -35,29 +40,60 @@ def find_minimum_variance_index(positions, velocities, length):
                 positions[i] = (positions[i] + velocities[i]) % length
     return min(enumerate(evolve()), key=lambda p: p[1])[0]
 
+def variance_ranks(positions, velocities, length):
+    positions = np.asarray(positions, dtype=np.int64)
+    velocities = np.asarray(velocities, dtype=np.int64)
+    frames = (positions[None, :] + np.arange(length, dtype=np.int64)[:, None] * velocities[None, :]) % length
+    return np.argsort(np.argsort(frames.var(axis=1)))
+
+def best_consistent_pair(xranks, yranks, g):
+    best = None
+    for residue in range(g):
+        tx = residue + g * int(np.argmin(xranks[residue::g]))
+        ty = residue + g * int(np.argmin(yranks[residue::g]))
+        score = xranks[tx] + yranks[ty]
+        if best is None or score < best[0]:
+            best = score, tx, ty
+    return best[1], best[2]
+
+assert best_consistent_pair(np.array([0, 1, 2, 3]), np.array([3, 2, 1, 0]), 1) == (0, 3)
+assert best_consistent_pair(np.array([0, 1, 3, 2]), np.array([2, 0, 3, 1]), 2) == (1, 1)
+
+def extended_gcd(a, b):
+    if b == 0:
+        return a, 1, 0
+    g, u, v = extended_gcd(b, a % b)
+    return g, v, u - (a // b) * v
+
+def crt(a, m, b, n):
+    g, u, _ = extended_gcd(m, n)
+    if (b - a) % g != 0:
+        raise ValueError(f"No T with T = {a} mod {m} and T = {b} mod {n}")
+    lcm = m // g * n
+    return (a + (b - a) // g * u % (n // g) * m) % lcm
+
+assert crt(2, 3, 3, 5) == 8
+assert crt(1, 4, 3, 6) == 9
+
 # Looking for the frame that minimizes the variance.
 
 # First, we look on each component.
 # (Note that the x-component is width-periodic and the y-component is height-periodic.)
-xmin = find_minimum_variance_index([px for px, py, vx, vy in robots], [vx for px, py, vx, vy in robots], width)
-ymin = find_minimum_variance_index([py for px, py, vx, vy in robots], [vy for px, py, vx, vy in robots], height)
+xranks = variance_ranks([px for px, py, vx, vy in robots], [vx for px, py, vx, vy in robots], width)
+yranks = variance_ranks([py for px, py, vx, vy in robots], [vy for px, py, vx, vy in robots], height)
+
+# When gcd(width, height) > 1, the two minima may not be compatible:
+# among the pairs of frames with xmin = ymin mod gcd(width, height),
+# we keep the one with the best combined rank.
+xmin, ymin = best_consistent_pair(xranks, yranks, extended_gcd(width, height)[0])
 
 # The index [T] of the frame that minimizes the variance is such that
-# T = xmin + p * width = ymin + q * height
-# for p and q some integers,
-# and we look for the smallest such T, that is to say 0 <= T < width * height
-# (because the whole animation is (width * height)-periodic).
-# We will find a first solution by asserting q = 0 (for instance),
-# and then we will slide this solution to fit inside the window 0 <= T < width * height.
-# If q = 0, then we have xmin + p * width = ymin
-# p * width = ymin - xmin
-# We now need an inverse for width. Note that we only need an equation on p modulo height
-# because p * width will be modulo width * height. By Fermat's little theorem,
-# width' = width ^ (height - 2) mod height is an inverse of width modulo height.
-# Therefore,
-
-p = (ymin - xmin) * pow(width, height - 2, mod=height)
-t = xmin + p * width
-
-t = t % (width * height)
+# T = xmin mod width and T = ymin mod height,
+# and we look for the smallest such T, that is to say 0 <= T < lcm(width, height)
+# (because the whole animation is lcm(width, height)-periodic).
+# The extended Euclidean algorithm gives u with u * width = gcd(width, height) mod height,
+# which solves the system whenever gcd(width, height) divides ymin - xmin,
+# whether or not height is prime.
+
+t = crt(xmin, width, ymin, height)
 print(f"Part 2: {t}")
@@ -1,3 +1,4 @@
+import heapq
 import sys
 
 grid = [line.strip() for line in sys.stdin]
@@ -46,6 +47,79 @@ def find_exit(grid):
                     new_positions[(x, y, dx, dy)] = score, tiles | known_tiles
     return best_found
 
-score, tiles = find_exit(grid)
+#score, tiles = find_exit(grid)
+#print(f"Part 1: {score}")
+#print(f"Part 2: {len(tiles)}")
+
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+def minimum_turns(dx, dy, tx, ty):
+    along = tx * dx + ty * dy
+    lateral = ty * dx - tx * dy
+    if along < 0:
+        return 2
+    if lateral != 0:
+        return 1
+    return 0
+
+def shortest_paths(grid, heuristic=False):
+    width = len(grid[0])
+    sx, sy = next((sx, sy) for (sy, l) in enumerate(grid) for (sx, c) in enumerate(l) if c == "S")
+    ex, ey = next((ex, ey) for (ey, l) in enumerate(grid) for (ex, c) in enumerate(l) if c == "E")
+
+    def estimate(state):
+        cell, direction = divmod(state, 4)
+        if not heuristic:
+            return 0
+        tx, ty = ex - cell % width, ey - cell // width
+        dx, dy = DIRECTIONS[direction]
+        return abs(tx) + abs(ty) + 1000 * minimum_turns(dx, dy, tx, ty)
+
+    distances = [None] * (len(grid) * width * 4)
+    predecessors = [None] * (len(grid) * width * 4)
+    start = (sy * width + sx) * 4
+    distances[start] = 0
+    queue = [(estimate(start), 0, start)]
+    best = None
+    ends = []
+    while queue:
+        priority, distance, state = heapq.heappop(queue)
+        if best is not None and priority > best:
+            break
+        if distance > distances[state]:
+            continue
+        cell, direction = divmod(state, 4)
+        x, y = cell % width, cell // width
+        if (x, y) == (ex, ey):
+            best = distance
+            ends.append(state)
+            continue
+        dx, dy = DIRECTIONS[direction]
+        nx, ny = x + dx, y + dy
+        successors = [(cell * 4 + (direction + 1) % 4, distance + 1000), (cell * 4 + (direction + 3) % 4, distance + 1000)]
+        if 0 <= ny < len(grid) and 0 <= nx < width and grid[ny][nx] != "#":
+            successors.append(((ny * width + nx) * 4 + direction, distance + 1))
+        for successor, successor_distance in successors:
+            known = distances[successor]
+            if known is None or successor_distance < known:
+                distances[successor] = successor_distance
+                predecessors[successor] = [state]
+                heapq.heappush(queue, (successor_distance + estimate(successor), successor_distance, successor))
+            elif successor_distance == known:
+                predecessors[successor].append(state)
+    return best, ends, predecessors
+
+def best_path_tiles(ends, predecessors):
+    seen = set(ends)
+    stack = list(ends)
+    while stack:
+        state = stack.pop()
+        for predecessor in predecessors[state] or ():
+            if predecessor not in seen:
+                seen.add(predecessor)
+                stack.append(predecessor)
+    return {state // 4 for state in seen}
+
+score, ends, predecessors = shortest_paths(grid)
 print(f"Part 1: {score}")
-print(f"Part 2: {len(tiles)}")
+print(f"Part 2: {len(best_path_tiles(ends, predecessors))}")
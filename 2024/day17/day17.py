@@ -1,6 +1,8 @@
 import re
 import sys
 
+import numpy as np
+
 lines = iter(sys.stdin)
 ra = int(re.match("Register A: (\d+)", next(lines)).groups(1)[0])
 rb = int(re.match("Register B: (\d+)", next(lines)).groups(1)[0])
@@ -62,4 +64,150 @@ def search(ra, i):
                 return result
     return None
 
-print(f"Part 2: {search(0, 0)}")
+#print(f"Part 2: {search(0, 0)}")
+
+def compile_combo_operand(operand):
+    if operand <= 3:
+        return str(operand)
+    if operand == 4:
+        return "ra"
+    if operand == 5:
+        return "rb"
+    if operand == 6:
+        return "rc"
+    raise ValueError(f"Invalid combo operand {operand}")
+
+def block_leaders(program):
+    leaders = {0}
+    pending = [0]
+    decoded = set()
+    while pending:
+        pc = pending.pop()
+        while pc + 1 < len(program) and pc not in decoded:
+            decoded.add(pc)
+            if program[pc] == 3:
+                for leader in (program[pc + 1], pc + 2):
+                    if leader + 1 < len(program) and leader not in leaders:
+                        leaders.add(leader)
+                        pending.append(leader)
+                break
+            pc += 2
+    return sorted(leaders)
+
+def compile_block(program, leaders, pc, vectorized):
+    shift = "shift({0}, {1})" if vectorized else "{0} >> {1}"
+    lines = []
+    while True:
+        if pc + 1 >= len(program):
+            fallthrough = -1
+            break
+        instr = program[pc]
+        operand = program[pc + 1]
+        if instr == 0:
+            lines.append("ra = " + shift.format("ra", compile_combo_operand(operand)))
+        elif instr == 1:
+            lines.append(f"rb = rb ^ {operand}")
+        elif instr == 2:
+            lines.append(f"rb = {compile_combo_operand(operand)} & 7")
+        elif instr == 3:
+            lines.append(("jump", operand if operand + 1 < len(program) else -1))
+            fallthrough = pc + 2 if pc + 3 < len(program) else -1
+            break
+        elif instr == 4:
+            lines.append("rb = rb ^ rc")
+        elif instr == 5:
+            value = compile_combo_operand(operand)
+            lines.append(f"output.append(lane({value} & 7))" if vectorized else f"output.append({value} & 7)")
+        elif instr == 6:
+            lines.append("rb = " + shift.format("ra", compile_combo_operand(operand)))
+        elif instr == 7:
+            lines.append("rc = " + shift.format("ra", compile_combo_operand(operand)))
+        pc += 2
+        if pc in leaders:
+            fallthrough = pc
+            break
+    return lines, fallthrough
+
+def compile_program(program):
+    leaders = block_leaders(program)
+    source = ["def run(ra, rb, rc):", "    output = []", "    pc = 0", "    while True:"]
+    for leader in leaders:
+        source.append(f"        if pc == {leader}:")
+        lines, fallthrough = compile_block(program, leaders, leader, vectorized=False)
+        for line in lines:
+            if isinstance(line, tuple):
+                _, target = line
+                source.append("            if ra != 0:")
+                source.append(f"                pc = {target}" if target >= 0 else "                return output")
+                source.append("                continue")
+            else:
+                source.append(f"            {line}")
+        source.append(f"            pc = {fallthrough}" if fallthrough >= 0 else "            return output")
+        source.append("            continue")
+    namespace = {}
+    exec("\n".join(source), namespace)
+    return namespace["run"]
+
+def compile_vectorized_program(program, dtype=np.uint64):
+    def shift(value, amount):
+        if dtype is object:
+            return value >> amount
+        amount = np.asarray(amount, dtype=np.uint64)
+        return np.where(amount >= 64, 0, value >> np.minimum(amount, 63)).astype(np.uint64)
+
+    leaders = block_leaders(program)
+    blocks = {}
+    for leader in leaders:
+        lines, fallthrough = compile_block(program, leaders, leader, vectorized=True)
+        source = ["def block(ra, rb, rc):", "    output = []", "    lane = lambda value: np.broadcast_to(np.asarray(value, dtype=ra.dtype), ra.shape)"]
+        target = fallthrough
+        for line in lines:
+            if isinstance(line, tuple):
+                _, target = line
+            else:
+                source.append(f"    {line}")
+        if any(isinstance(line, tuple) for line in lines):
+            source.append(f"    return ra, rb, rc, output, np.where(ra != 0, {target}, {fallthrough})")
+        else:
+            source.append(f"    return ra, rb, rc, output, np.full(ra.shape, {fallthrough})")
+        namespace = {"np": np, "shift": shift}
+        exec("\n".join(source), namespace)
+        blocks[leader] = namespace["block"]
+
+    def run_many(ras, rb, rc):
+        ra = np.array(ras, dtype=dtype)
+        rb = np.full(ra.shape, rb, dtype=dtype)
+        rc = np.full(ra.shape, rc, dtype=dtype)
+        pcs = np.zeros(ra.shape, dtype=np.int64)
+        outputs = [[] for _ in range(len(ra))]
+        active = np.arange(len(ra))
+        while active.size > 0:
+            for leader in np.unique(pcs[active]).tolist():
+                lanes = active[pcs[active] == leader]
+                ra[lanes], rb[lanes], rc[lanes], output, pcs[lanes] = blocks[leader](ra[lanes], rb[lanes], rc[lanes])
+                for values in output:
+                    for lane, value in zip(lanes.tolist(), values.tolist()):
+                        outputs[lane].append(value)
+            active = active[pcs[active] >= 0]
+        return outputs
+
+    return run_many
+
+run = compile_program(program)
+assert run(ra, rb, rc) == output
+
+run_many = compile_vectorized_program(program)
+assert run_many([ra], rb, rc) == [output]
+
+def compiled_search(ra, i):
+    if i >= len(program):
+        return ra
+    expected = program[- i - 1:]
+    for v, output in enumerate(run_many([8 * ra + v for v in range(8)], rb, rc)):
+        if output == expected:
+            result = compiled_search(8 * ra + v, i + 1)
+            if result is not None:
+                return result
+    return None
+
+print(f"Part 2: {compiled_search(0, 0)}")
@@ -1,14 +1,21 @@
+import argparse
 import sys
 
-coords = [map(int, line.strip().split(",")) for line in sys.stdin]
+parser = argparse.ArgumentParser()
+parser.add_argument("size", type=int, nargs="?", help="grid size (default: inferred from the input)")
+parser.add_argument("corrupted", type=int, nargs="?", default=1024, help="number of bytes fallen for Part 1")
+parser.add_argument("--cutoff", choices=("union-find", "binary-search", "linear"), default="union-find")
+args = parser.parse_args()
 
-size = 71
-#size = 7
+coords = [tuple(map(int, line.strip().split(","))) for line in sys.stdin]
+
+size = args.size
+if size is None:
+    size = max(max(x, y) for x, y in coords) + 1
 
 grid = [["." for _ in range(size)] for _ in range(size)]
 
-corrupted = 1024
-#corrupted = 12
+corrupted = args.corrupted
 for x, y in coords[:corrupted]:
     grid[y][x] = "#"
 
@@ -35,13 +42,92 @@ def minimum_steps(grid):
         new_reachable = next_reachable
         reachable |= new_reachable
 
+def is_cut(grid):
+    return grid[0][0] == "#" or minimum_steps(grid) is None
+
 print(f"Part 1: {minimum_steps(grid)}")
 
+# All the engines look for the first byte of the whole list that cuts the
+# path. The first [corrupted] bytes are skipped only when they are known
+# not to cut it already.
+start = corrupted if not is_cut(grid) else 0
+
 def first_cutoff(grid, coords):
     for x, y in coords:
         grid[y][x] = "#"
-        if minimum_steps(grid) is None:
+        if is_cut(grid):
             return(x, y)
 
-cx, cy = first_cutoff(grid, coords[corrupted:])
-print(f"Part 2: {cx},{cy}")
+def find(parents, cell):
+    while parents[cell] != cell:
+        parents[cell] = parents[parents[cell]]
+        cell = parents[cell]
+    return cell
+
+def union(parents, a, b):
+    a = find(parents, a)
+    b = find(parents, b)
+    if a != b:
+        parents[a] = b
+
+def union_find_cutoff(coords, start):
+    blocked = [0] * (size * size)
+    for x, y in coords:
+        blocked[y * size + x] += 1
+    parents = list(range(size * size))
+
+    def free(cell):
+        x, y = cell % size, cell // size
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < size and 0 <= ny < size and not blocked[ny * size + nx]:
+                union(parents, cell, ny * size + nx)
+
+    end = size * size - 1
+    def connected():
+        return not blocked[0] and not blocked[end] and find(parents, 0) == find(parents, end)
+
+    for cell in range(size * size):
+        if not blocked[cell]:
+            free(cell)
+    if connected():
+        return None
+    for x, y in reversed(coords[start:]):
+        cell = y * size + x
+        blocked[cell] -= 1
+        if blocked[cell]:
+            continue
+        free(cell)
+        if connected():
+            return x, y
+
+def binary_search_cutoff(coords, start):
+    def cut(count):
+        grid = [["." for _ in range(size)] for _ in range(size)]
+        for x, y in coords[:count]:
+            grid[y][x] = "#"
+        return is_cut(grid)
+
+    low, high = start, len(coords)
+    if not cut(high):
+        return None
+    while low < high:
+        middle = (low + high) // 2
+        if cut(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return coords[low - 1]
+
+if args.cutoff == "union-find":
+    cutoff = union_find_cutoff(coords, start)
+elif args.cutoff == "binary-search":
+    cutoff = binary_search_cutoff(coords, start)
+else:
+    if start == 0:
+        grid = [["." for _ in range(size)] for _ in range(size)]
+    cutoff = first_cutoff(grid, coords[start:])
+if cutoff is None:
+    print("Part 2: None")
+else:
+    cx, cy = cutoff
+    print(f"Part 2: {cx},{cy}")
@@ -1,4 +1,5 @@
 import sys
+import time
 
 lines = iter(sys.stdin)
 
@@ -17,9 +18,63 @@ def count_possible(design, patterns):
         counts[i] = s
     return counts[len(design)]
 
-part1 = sum(1 for design in designs if count_possible(design, patterns) > 0)
-print(f"Part 1: {part1}")
+#part1 = sum(1 for design in designs if count_possible(design, patterns) > 0)
+#print(f"Part 1: {part1}")
 
-part2 = sum(count_possible(design, patterns) for design in designs)
-print(f"Part 2: {part2}")
+#part2 = sum(count_possible(design, patterns) for design in designs)
+#print(f"Part 2: {part2}")
+
+def build_trie(patterns):
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for c in pattern:
+            node = node.setdefault(c, {})
+        node[None] = True
+    return trie
+
+def matches(trie, design, i):
+    node = trie
+    for j in range(i, len(design)):
+        node = node.get(design[j])
+        if node is None:
+            return
+        if None in node:
+            yield j + 1
 
+def is_possible(design, trie):
+    reachable = [False for _ in range(len(design) + 1)]
+    reachable[0] = True
+    for i in range(len(design)):
+        if reachable[i]:
+            for j in matches(trie, design, i):
+                if j == len(design):
+                    return True
+                reachable[j] = True
+    return len(design) == 0
+
+def count_arrangements(design, trie):
+    counts = [0 for _ in range(len(design) + 1)]
+    counts[0] = 1
+    for i in range(len(design)):
+        if counts[i]:
+            for j in matches(trie, design, i):
+                counts[j] += counts[i]
+    return counts[len(design)]
+
+trie = build_trie(patterns)
+
+part1 = 0
+part2 = 0
+for design in designs:
+    start = time.perf_counter()
+    possible = is_possible(design, trie)
+    middle = time.perf_counter()
+    count = count_arrangements(design, trie) if possible else 0
+    end = time.perf_counter()
+    print(f"{design}: {(middle - start) * 1e6:.0f}us (Part 1), {(end - middle) * 1e6:.0f}us (Part 2)", file=sys.stderr)
+    part1 += possible
+    part2 += count
+
+print(f"Part 1: {part1}")
+print(f"Part 2: {part2}")
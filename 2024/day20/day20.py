@@ -1,5 +1,7 @@
 import sys
 
+import numpy as np
+
 grid = [line.strip() for line in sys.stdin]
 
 start_pos = next((x, y) for (y, line) in enumerate(grid) for (x, c) in enumerate(line) if c == "S")
@@ -63,5 +65,25 @@ def part2(grid, timecodes):
                             cheats[cheat] = cheats.get(cheat, 0) + 1
     return sum(count for cheat, count in cheats.items() if cheat >= 100)
 
-print(f"Part 2: {part2(grid, timecodes)}")
+#print(f"Part 2: {part2(grid, timecodes)}")
+
+def timecode_array(timecodes):
+    return np.array([[-1 if timecode is None else timecode for timecode in line] for line in timecodes], dtype=np.int64)
+
+def count_cheats(times, max_cheat_duration, threshold=1):
+    height, width = times.shape
+    histogram = np.zeros(times.max() + 1, dtype=np.int64)
+    for dy in range(- max_cheat_duration, max_cheat_duration + 1):
+        for dx in range(- max_cheat_duration + abs(dy), max_cheat_duration + 1 - abs(dy)):
+            if abs(dx) >= width or abs(dy) >= height:
+                continue
+            sources = times[max(0, - dy):height - max(0, dy), max(0, - dx):width - max(0, dx)]
+            targets = times[max(0, dy):height + min(0, dy), max(0, dx):width + min(0, dx)]
+            savings = targets - sources - abs(dx) - abs(dy)
+            savings = savings[(sources >= 0) & (targets >= 0) & (savings >= threshold)]
+            if len(savings) > 0:
+                histogram += np.bincount(savings, minlength=len(histogram))
+    return {int(cheat): int(count) for cheat, count in enumerate(histogram) if count > 0}
 
+cheats = count_cheats(timecode_array(timecodes), 20, 100)
+print(f"Part 2: {sum(cheats.values())}")
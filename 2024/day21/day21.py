@@ -1,3 +1,4 @@
+import collections
 import sys
 
 codes = [line.strip() for line in sys.stdin]
@@ -78,5 +79,84 @@ memo_table = {}
 assert find_shortest_digits(memo_table, "029A", 0) == len("<A^A>^^AvvvA")
 assert find_shortest_digits(memo_table, "029A", 1) == len("v<<A>>^A<A>AvA<^AA>A<vAAA>^A")
 
-print(f"Part 1: {solve(memo_table, codes, 2)}")
-print(f"Part 2: {solve(memo_table, codes, 25)}")
+#print(f"Part 1: {solve(memo_table, codes, 2)}")
+#print(f"Part 2: {solve(memo_table, codes, 25)}")
+
+MOVES = {"<": (-1, 0), ">": (1, 0), "^": (0, -1), "v": (0, 1)}
+
+def key_positions(keyboard):
+    return {c: (x, y) for y, line in enumerate(keyboard) for x, c in enumerate(line) if c != " "}
+
+def key_paths(keyboard):
+    positions = key_positions(keyboard)
+
+    def is_key(x, y):
+        return 0 <= y < len(keyboard) and 0 <= x < len(keyboard[y]) and keyboard[y][x] != " "
+
+    def distances_to(x, y):
+        distances = {(x, y): 0}
+        queue = collections.deque([(x, y)])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in MOVES.values():
+                if is_key(x + dx, y + dy) and (x + dx, y + dy) not in distances:
+                    distances[(x + dx, y + dy)] = distances[(x, y)] + 1
+                    queue.append((x + dx, y + dy))
+        return distances
+
+    def paths_between(x, y, distances):
+        if (x, y) not in distances:
+            return []
+        if distances[(x, y)] == 0:
+            return ["A"]
+        paths = []
+        for move, (dx, dy) in MOVES.items():
+            if (x + dx, y + dy) in distances and distances[(x + dx, y + dy)] == distances[(x, y)] - 1:
+                paths.extend(move + path for path in paths_between(x + dx, y + dy, distances))
+        return paths
+
+    paths = {}
+    for b in positions:
+        distances = distances_to(*positions[b])
+        for a in positions:
+            paths[(a, b)] = paths_between(*positions[a], distances)
+    return paths
+
+def press_costs(keyboard, costs):
+    return {
+        keys: min(sum(costs[(c, nc)] for c, nc in zip("A" + path, path)) for path in paths)
+        for keys, paths in key_paths(keyboard).items()}
+
+def sequence_cost(costs, sequence):
+    return sum(costs[(c, nc)] for c, nc in zip("A" + sequence, sequence))
+
+class KeypadChain:
+    def __init__(self, door_keyboard=digit_keyboard, robot_keyboard=arrow_keyboard):
+        self.door_keyboard = door_keyboard
+        self.robot_keyboard = robot_keyboard
+        self.robot_costs = [{(a, b): 1 for a in key_positions(robot_keyboard) for b in key_positions(robot_keyboard)}]
+        self.door_costs = {}
+
+    def costs(self, level_count):
+        while len(self.robot_costs) <= level_count:
+            self.robot_costs.append(press_costs(self.robot_keyboard, self.robot_costs[-1]))
+        door_costs = self.door_costs.get(level_count)
+        if door_costs is None:
+            door_costs = press_costs(self.door_keyboard, self.robot_costs[level_count])
+            self.door_costs[level_count] = door_costs
+        return door_costs
+
+    def solve(self, codes, level_count):
+        costs = self.costs(level_count)
+        return sum(sequence_cost(costs, code) * int(code.replace("A", "")) for code in codes)
+
+chain = KeypadChain()
+
+assert sequence_cost(chain.costs(0), "029A") == find_shortest_digits(memo_table, "029A", 0)
+assert sequence_cost(chain.costs(1), "029A") == find_shortest_digits(memo_table, "029A", 1)
+assert sequence_cost(chain.costs(25), "379A") == find_shortest_digits(memo_table, "379A", 25)
+assert sorted(key_paths(["1 2", "34A"])[("1", "2")]) == ["v>>^A"]
+assert KeypadChain(door_keyboard=["1 2", "34A"]).solve(["12A"], 2) == 780
+
+print(f"Part 1: {chain.solve(codes, 2)}")
+print(f"Part 2: {chain.solve(codes, 25)}")
@@ -1,5 +1,8 @@
+import functools
 import sys
 
+import numpy as np
+
 initial_secret_numbers = [int(line.strip()) for line in sys.stdin]
 
 def mix(secret_number, value):
@@ -35,7 +38,7 @@ def part1(initial_secret_numbers):
         s += secret_number
     return s
 
-print(f"Part 1: {part1(initial_secret_numbers)}")
+#print(f"Part 1: {part1(initial_secret_numbers)}")
 
 def part2(initial_secret_numbers):
     all_sequences = {}
@@ -60,4 +63,96 @@ def part2(initial_secret_numbers):
             all_sequences[sequence] = all_sequences.get(sequence, 0) + price
     return max(all_sequences.items(), key=lambda p: p[1])[1]
 
-print(f"Part 2: {part2(initial_secret_numbers)}")
+#print(f"Part 2: {part2(initial_secret_numbers)}")
+
+def next_secret_numbers(secret_numbers):
+    secret_numbers = (secret_numbers ^ (secret_numbers << 6)) & 0xFFFFFF
+    secret_numbers ^= secret_numbers >> 5
+    secret_numbers = (secret_numbers ^ (secret_numbers << 11)) & 0xFFFFFF
+    return secret_numbers
+
+assert list(next_secret_numbers(np.array([123, 15887950], dtype=np.uint32))) == [15887950, 16495136]
+
+def secret_number_matrix(initial_secret_numbers, steps=2000):
+    secret_numbers = np.asarray(initial_secret_numbers, dtype=np.uint32)
+    matrix = np.empty((len(secret_numbers), steps + 1), dtype=np.uint32)
+    matrix[:, 0] = secret_numbers
+    for i in range(steps):
+        secret_numbers = next_secret_numbers(secret_numbers)
+        matrix[:, i + 1] = secret_numbers
+    return matrix
+
+def batched_part1(initial_secret_numbers):
+    secret_numbers = np.asarray(initial_secret_numbers, dtype=np.uint32)
+    for _ in range(2000):
+        secret_numbers = next_secret_numbers(secret_numbers)
+    return int(secret_numbers.sum(dtype=np.uint64))
+
+assert batched_part1([1, 10, 100, 2024]) == part1([1, 10, 100, 2024]) == 37327623
+
+def batched_part2(initial_secret_numbers, chunk_size=4096):
+    totals = np.zeros(19 ** 4, dtype=np.int64)
+    for start in range(0, len(initial_secret_numbers), chunk_size):
+        chunk = initial_secret_numbers[start:start + chunk_size]
+        prices = (secret_number_matrix(chunk) % 10).astype(np.int32)
+        changes = np.diff(prices, axis=1) + 9
+        codes = (
+            changes[:, :-3] * 19 ** 3 + changes[:, 1:-2] * 19 ** 2
+            + changes[:, 2:-1] * 19 + changes[:, 3:])
+        keys = np.arange(len(chunk), dtype=np.int64)[:, None] * 19 ** 4 + codes
+        _, first = np.unique(keys.ravel(), return_index=True)
+        totals += np.bincount(
+            codes.ravel()[first], weights=prices[:, 4:].ravel()[first],
+            minlength=19 ** 4).astype(np.int64)
+    return int(totals.max())
+
+assert batched_part2([1, 2, 3, 2024]) == part2([1, 2, 3, 2024]) == 23
+
+def apply_matrix(columns, secret_number):
+    result = 0
+    for column in columns:
+        if secret_number & 1:
+            result ^= column
+        secret_number >>= 1
+    return result
+
+def compose_matrices(a, b):
+    return [apply_matrix(a, column) for column in b]
+
+STEP_MATRIX = [next_secret_number(1 << bit) for bit in range(24)]
+IDENTITY_MATRIX = [1 << bit for bit in range(24)]
+
+@functools.cache
+def power_matrix(n):
+    result = IDENTITY_MATRIX
+    square = STEP_MATRIX
+    while n > 0:
+        if n & 1:
+            result = compose_matrices(square, result)
+        square = compose_matrices(square, square)
+        n >>= 1
+    return result
+
+def advance(secret_number, n):
+    return apply_matrix(power_matrix(n), secret_number)
+
+def iterate(secret_number, n):
+    for _ in range(n):
+        secret_number = next_secret_number(secret_number)
+    return secret_number
+
+assert all(advance(123, n) == iterate(123, n) for n in range(50))
+assert advance(123, 10 ** 12 + 1) == next_secret_number(advance(123, 10 ** 12))
+
+def batched_advance(secret_numbers, n):
+    secret_numbers = np.asarray(secret_numbers, dtype=np.uint32)
+    result = np.zeros_like(secret_numbers)
+    for bit, column in enumerate(power_matrix(n)):
+        result ^= np.where((secret_numbers >> bit) & 1, np.uint32(column), np.uint32(0))
+    return result
+
+assert sum(advance(secret_number, 2000) for secret_number in [1, 10, 100, 2024]) == part1([1, 10, 100, 2024])
+assert int(batched_advance([1, 10, 100, 2024], 2000).sum()) == part1([1, 10, 100, 2024])
+
+print(f"Part 1: {int(batched_advance(initial_secret_numbers, 2000).sum(dtype=np.uint64))}")
+print(f"Part 2: {batched_part2(initial_secret_numbers)}")
@@ -1,3 +1,4 @@
+import heapq
 import sys
 
 links = [line.strip().split("-") for line in sys.stdin]
@@ -7,22 +8,109 @@ for a, b in links:
     link_map.setdefault(a, set()).add(b)
     link_map.setdefault(b, set()).add(a)
 
-three_sets = {frozenset([a, b, c]) for a, b in links for c in link_map[a] & link_map[b] if any(s.startswith("t") for s in (a, b, c))}
+def find_three_sets(links, link_map):
+    return {frozenset([a, b, c]) for a, b in links for c in link_map[a] & link_map[b] if any(s.startswith("t") for s in (a, b, c))}
 
-part1 = len(three_sets)
+def count_triangles(names, links, predicate):
+    ids = {name: i for i, name in enumerate(names)}
+    edges = {tuple(sorted((ids[a], ids[b]))) for a, b in links}
+    degrees = [0] * len(names)
+    for u, v in edges:
+        degrees[u] += 1
+        degrees[v] += 1
+    # Orient every edge towards the endpoint of higher degree, so that each
+    # node has O(sqrt(m)) out-neighbours and each triangle is found once.
+    successors = [[] for _ in names]
+    for u, v in edges:
+        if (degrees[u], u) > (degrees[v], v):
+            u, v = v, u
+        successors[u].append(v)
+    flags = [predicate(name) for name in names]
+    marks = [-1] * len(names)
+    count = 0
+    for u in range(len(names)):
+        for v in successors[u]:
+            marks[v] = u
+        for v in successors[u]:
+            for w in successors[v]:
+                if marks[w] == u and (flags[u] or flags[v] or flags[w]):
+                    count += 1
+    return count
+
+def grow_cliques(three_sets):
+    cliques = three_sets
+    while True:
+        new_cliques = set()
+        for s in cliques:
+            neighbors, *others = [link_map[y] for y in s]
+            for x in neighbors.intersection(*others):
+                new_cliques.add(s | {x})
+        if not new_cliques:
+            break
+        cliques = new_cliques
+    max_clique, = cliques
+    return max_clique
+
+def intern_graph(link_map):
+    names = sorted(link_map)
+    ids = {name: i for i, name in enumerate(names)}
+    adjacency = [0] * len(names)
+    for name, neighbors in link_map.items():
+        for neighbor in neighbors:
+            adjacency[ids[name]] |= 1 << ids[neighbor]
+    return names, adjacency
+
+def bits(bitset):
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+def degeneracy_order(adjacency):
+    degrees = [adjacency[v].bit_count() for v in range(len(adjacency))]
+    queue = [(degree, v) for v, degree in enumerate(degrees)]
+    heapq.heapify(queue)
+    removed = 0
+    order = []
+    while queue:
+        degree, v = heapq.heappop(queue)
+        if removed >> v & 1 or degree != degrees[v]:
+            continue
+        removed |= 1 << v
+        order.append(v)
+        for neighbor in bits(adjacency[v] & ~removed):
+            degrees[neighbor] -= 1
+            heapq.heappush(queue, (degrees[neighbor], neighbor))
+    return order
+
+def maximum_clique(adjacency):
+    best = 0
+
+    def expand(clique, candidates, excluded):
+        nonlocal best
+        if candidates == 0:
+            if excluded == 0 and clique.bit_count() > best.bit_count():
+                best = clique
+            return
+        if clique.bit_count() + candidates.bit_count() <= best.bit_count():
+            return
+        pivot = max(bits(candidates | excluded), key=lambda u: (candidates & adjacency[u]).bit_count())
+        for v in bits(candidates & ~adjacency[pivot]):
+            expand(clique | 1 << v, candidates & adjacency[v], excluded & adjacency[v])
+            candidates &= ~(1 << v)
+            excluded |= 1 << v
+
+    later = (1 << len(adjacency)) - 1
+    for v in degeneracy_order(adjacency):
+        later &= ~(1 << v)
+        expand(1 << v, adjacency[v] & later, adjacency[v] & ~later & ~(1 << v))
+    return best
+
+names, adjacency = intern_graph(link_map)
+
+part1 = count_triangles(names, links, lambda name: name.startswith("t"))
 print(f"Part 1: {part1}")
 
-cliques = three_sets
-while True:
-    new_cliques = set()
-    for s in cliques:
-        neighbors, *others = [link_map[y] for y in s]
-        for x in neighbors.intersection(*others):
-            new_cliques.add(s | {x})
-    if not new_cliques:
-        break
-    cliques = new_cliques
-
-max_clique, = cliques
+max_clique = [names[v] for v in bits(maximum_clique(adjacency))]
 part2 = ",".join(sorted(max_clique))
 print(f"Part 2: {part2}")
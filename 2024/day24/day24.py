@@ -2,6 +2,7 @@ from __future__ import annotations
 import abc
 from dataclasses import dataclass
 import enum
+import random
 import re
 import sys
 import typing
@@ -71,6 +72,100 @@ def part1(defs):
         result = result * 2 + defs[wire].eval(defs)
     return result
 
+@dataclass
+class CompiledCircuit:
+    wires: list[str]
+    index: dict[str, int]
+    program: list[tuple[int, Op, int, int]]
+
+    def eval(self, words: dict[str, typing.Any]) -> list[typing.Any]:
+        values = [None] * len(self.wires)
+        for wire, word in words.items():
+            values[self.index[wire]] = word
+        for out, op, in0, in1 in self.program:
+            if op == Op.AND:
+                values[out] = values[in0] & values[in1]
+            elif op == Op.OR:
+                values[out] = values[in0] | values[in1]
+            elif op == Op.XOR:
+                values[out] = values[in0] ^ values[in1]
+            else:
+                typing.assert_never(op)
+        return values
+
+    def read(self, values: list[typing.Any], prefix: str) -> typing.Any:
+        result = 0
+        for wire in reversed(sorted(wire for wire in self.wires if wire[0] == prefix)):
+            result = result * 2 + values[self.index[wire]]
+        return result
+
+class CycleError(Exception):
+    pass
+
+def compile_circuit(defs: dict[str, Evaluable]) -> CompiledCircuit:
+    wires = []
+    index = {}
+    program = []
+    visiting = set()
+    for root in defs:
+        stack = [(root, False)]
+        while stack:
+            wire, expanded = stack.pop()
+            if wire in index:
+                continue
+            d = defs[wire]
+            if isinstance(d, InitialValue):
+                index[wire] = len(wires)
+                wires.append(wire)
+            elif expanded:
+                visiting.discard(wire)
+                index[wire] = len(wires)
+                wires.append(wire)
+                program.append((index[wire], d.op, index[d.in0], index[d.in1]))
+            else:
+                if wire in visiting:
+                    raise CycleError(wire)
+                visiting.add(wire)
+                stack.append((wire, True))
+                stack.append((d.in0, False))
+                stack.append((d.in1, False))
+    return CompiledCircuit(wires, index, program)
+
+def compile_settled(defs: dict[str, Evaluable]) -> CompiledCircuit:
+    # Like compile_circuit, but the wires that depend on a cycle are left
+    # out instead of raising a CycleError.
+    wires = []
+    index = {}
+    program = []
+    consumers = {}
+    missing = {}
+    for wire, d in defs.items():
+        if isinstance(d, InitialValue):
+            index[wire] = len(wires)
+            wires.append(wire)
+        else:
+            missing[wire] = 2
+            consumers.setdefault(d.in0, []).append(wire)
+            consumers.setdefault(d.in1, []).append(wire)
+    stack = list(wires)
+    while stack:
+        for consumer in consumers.get(stack.pop(), []):
+            missing[consumer] -= 1
+            if missing[consumer] == 0:
+                d = defs[consumer]
+                index[consumer] = len(wires)
+                wires.append(consumer)
+                program.append((index[consumer], d.op, index[d.in0], index[d.in1]))
+                stack.append(consumer)
+    return CompiledCircuit(wires, index, program)
+
+def initial_words(defs: dict[str, Evaluable]) -> dict[str, int]:
+    return {wire: int(d.value) for wire, d in defs.items() if isinstance(d, InitialValue)}
+
+def compiled_part1(defs):
+    circuit = compile_circuit(defs)
+    return circuit.read(circuit.eval(initial_words(defs)), "z")
+
 def part2(defs):
     nbits_x = len([wire for wire in defs.keys() if wire[0] == "x"])
     nbits_y = len([wire for wire in defs.keys() if wire[0] == "y"])
@@ -80,36 +175,373 @@ def part2(defs):
     assert defs["z00"].in0 == "y00"
     assert defs["z00"].op == Op.XOR
     assert defs["z00"].in1 == "x00"
-    r = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.AND and {d.in0, d.in1} == {"x00", "y00"})
+    gates = {}
+    gates_by_input = {}
+    def index_gate(wire):
+        d = defs[wire]
+        if isinstance(d, Gate):
+            gates[(d.op, frozenset((d.in0, d.in1)))] = wire
+            for input in (d.in0, d.in1):
+                gates_by_input.setdefault((d.op, input), set()).add(wire)
+    def unindex_gate(wire):
+        d = defs[wire]
+        if isinstance(d, Gate):
+            for input in (d.in0, d.in1):
+                gates_by_input[(d.op, input)].discard(wire)
+    for wire in defs:
+        index_gate(wire)
+    def find_gate(op, in0, in1):
+        return gates[(op, frozenset((in0, in1)))]
+    r = find_gate(Op.AND, "x00", "y00")
     swapped = []
     def swap(a, b):
         swapped.append(a)
         swapped.append(b)
+        unindex_gate(a)
+        unindex_gate(b)
         def_a = defs[a]
         def_b = defs[b]
         defs[b] = def_a
         defs[a] = def_b
+        index_gate(a)
+        index_gate(b)
     for i in range(1, nbits_z - 1):
         x = f"x{i:02}"
         y = f"y{i:02}"
         z = f"z{i:02}"
-        s = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.XOR and {d.in0, d.in1} == {x, y})
+        s = find_gate(Op.XOR, x, y)
         try:
-            t = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.XOR and {d.in0, d.in1} == {s, r})
-        except StopIteration:
-            t, = [wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.XOR and r in {d.in0, d.in1}]
-            s0, = {defs[t].in0, defs[t].in0} - {r}
+            t = find_gate(Op.XOR, s, r)
+        except KeyError:
+            t, = gates_by_input[(Op.XOR, r)]
+            s0, = {defs[t].in0, defs[t].in1} - {r}
             swap(s, s0)
             s = s0
         if t != z:
             swap(t, z)
 
-        a = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.AND and {d.in0, d.in1} == {x, y})
-        b = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.AND and {d.in0, d.in1} == {s, r})
-        r = next(wire for wire, d in defs.items() if isinstance(d, Gate) and d.op == Op.OR and {d.in0, d.in1} == {a, b})
+        a = find_gate(Op.AND, x, y)
+        b = find_gate(Op.AND, s, r)
+        r = find_gate(Op.OR, a, b)
+    return ",".join(sorted(swapped))
+
+def swap_wires(defs: dict[str, Evaluable], a: str, b: str) -> None:
+    defs[a], defs[b] = defs[b], defs[a]
+
+def cone(defs: dict[str, Evaluable], wire: str, avoided: str | None = None) -> set[str]:
+    result = set()
+    stack = [wire]
+    while stack:
+        wire = stack.pop()
+        d = defs[wire]
+        if isinstance(d, Gate) and wire not in result and wire != avoided:
+            result.add(wire)
+            stack.append(d.in0)
+            stack.append(d.in1)
+    return result
+
+def near(defs: dict[str, Evaluable], wire: str, trusted: set[str], depth: int) -> list[str]:
+    result = []
+    layer = [wire]
+    for _ in range(depth + 1):
+        next_layer = []
+        for wire in layer:
+            d = defs[wire]
+            if isinstance(d, Gate) and wire not in trusted and wire not in result:
+                result.append(wire)
+                next_layer.append(d.in0)
+                next_layer.append(d.in1)
+        layer = next_layer
+    return result
+
+def eval_cone(defs: dict[str, Evaluable], wire: str, known: dict[str, int]) -> int:
+    visiting = set()
+    stack = [wire]
+    while stack:
+        current = stack[-1]
+        if current in known:
+            stack.pop()
+            continue
+        d = defs[current]
+        if isinstance(d, InitialValue):
+            raise KeyError(current)
+        if d.in0 in known and d.in1 in known:
+            in0 = known[d.in0]
+            in1 = known[d.in1]
+            if d.op == Op.AND:
+                known[current] = in0 & in1
+            elif d.op == Op.OR:
+                known[current] = in0 | in1
+            elif d.op == Op.XOR:
+                known[current] = in0 ^ in1
+            else:
+                typing.assert_never(d.op)
+            visiting.discard(current)
+            stack.pop()
+            continue
+        if current in visiting:
+            raise CycleError(current)
+        visiting.add(current)
+        stack.append(d.in0)
+        stack.append(d.in1)
+    return known[wire]
+
+def consumers_of(defs: dict[str, Evaluable], wires: typing.Iterable[str]) -> dict[str, list[str]]:
+    consumers = {}
+    for wire in wires:
+        d = defs[wire]
+        if isinstance(d, Gate):
+            consumers.setdefault(d.in0, []).append(wire)
+            consumers.setdefault(d.in1, []).append(wire)
+    return consumers
+
+def dependents(consumers: dict[str, list[str]], wires: typing.Iterable[str]) -> set[str]:
+    result = set()
+    stack = list(wires)
+    while stack:
+        wire = stack.pop()
+        if wire not in result:
+            result.add(wire)
+            stack.extend(consumers.get(wire, []))
+    return result
+
+def reevaluate(
+    defs: dict[str, Evaluable], values: dict[str, int], consumers: dict[str, list[str]], wires: typing.Iterable[str]
+) -> dict[str, int]:
+    # Recomputes the dependents of wires in topological order; as with
+    # compile_settled, the ones that depend on a cycle are left out.
+    changed = dependents(consumers, wires)
+    result = {wire: value for wire, value in values.items() if wire not in changed}
+    missing = {wire: (defs[wire].in0 not in result) + (defs[wire].in1 not in result) for wire in changed}
+    stack = [wire for wire, count in missing.items() if count == 0]
+    while stack:
+        wire = stack.pop()
+        d = defs[wire]
+        if d.op == Op.AND:
+            result[wire] = result[d.in0] & result[d.in1]
+        elif d.op == Op.OR:
+            result[wire] = result[d.in0] | result[d.in1]
+        elif d.op == Op.XOR:
+            result[wire] = result[d.in0] ^ result[d.in1]
+        else:
+            typing.assert_never(d.op)
+        for consumer in consumers.get(wire, []):
+            missing[consumer] -= 1
+            if missing[consumer] == 0:
+                stack.append(consumer)
+    return result
+
+def pack_words(numbers: list[int], nbits: int) -> list[int]:
+    words = [0] * nbits
+    for lane, number in enumerate(numbers):
+        for bit in range(nbits):
+            if number >> bit & 1:
+                words[bit] |= 1 << lane
+    return words
+
+def test_vectors(nbits: int, count: int, seed: int = 0) -> list[tuple[int, int]]:
+    ones = (1 << nbits) - 1
+    vectors = [(0, 0), (ones, 0), (0, ones), (ones, 1), (1, ones), (ones, ones)]
+    for i in range(nbits):
+        vectors.append((1 << i, 0))
+        vectors.append((0, 1 << i))
+        vectors.append((1 << i, 1 << i))
+        vectors.append(((1 << i) - 1, 1))
+        vectors.append((1, (1 << i) - 1))
+    generator = random.Random(seed)
+    while len(vectors) < count:
+        vectors.append((generator.getrandbits(nbits), generator.getrandbits(nbits)))
+    return vectors
+
+@dataclass
+class AdderVerifier:
+    nbits: int
+    words: dict[str, int]
+    expected: list[int]
+    mask: int
+    depth: int = 2
+
+    @classmethod
+    def create(cls, defs: dict[str, Evaluable], count: int = 4096, seed: int = 0) -> AdderVerifier:
+        nbits = len([wire for wire in defs.keys() if wire[0] == "x"])
+        vectors = test_vectors(nbits, count, seed)
+        words = {}
+        for prefix, numbers in (("x", [x for x, _ in vectors]), ("y", [y for _, y in vectors])):
+            for bit, word in enumerate(pack_words(numbers, nbits)):
+                words[f"{prefix}{bit:02}"] = word
+        expected = pack_words([x + y for x, y in vectors], nbits + 1)
+        return cls(nbits, words, expected, (1 << len(vectors)) - 1)
+
+    def lowest_faulty_bit(self, defs: dict[str, Evaluable]) -> tuple[int | None, dict[str, int]]:
+        # Undoing the swaps one bit at a time may go through circuits with
+        # cycles above the current bit: the bits that depend on a cycle are
+        # faulty, and the values of the other wires are still known.
+        circuit = compile_settled(defs)
+        values = circuit.eval(self.words)
+        known = {wire: values[index] for wire, index in circuit.index.items()}
+        for bit in range(self.nbits + 1):
+            if known.get(f"z{bit:02}") != self.expected[bit]:
+                return bit, known
+        if len(known) < len(defs):
+            raise CycleError(next(wire for wire in defs if wire not in known))
+        return None, known
+
+    def fixing_swaps(
+            self, defs: dict[str, Evaluable], bit: int, values: dict[str, int],
+            trusted: set[str], others: list[str]) -> typing.Iterator[tuple[str, str]]:
+        # Once the lower bits are right, the misplaced gates that z still
+        # needs are within [depth] gates of z. Swapping such a wire a with b
+        # gives a the value of b: forcing a to all zeros and to all ones
+        # tells, lane by lane, which value a should take for z to be right,
+        # so that the matching b can be looked up anywhere in the circuit.
+        z = f"z{bit:02}"
+        consumers = consumers_of(defs, cone(defs, z))
+
+        def eval_with(overrides: dict[str, int]) -> int:
+            known = dict(values)
+            for wire in dependents(consumers, overrides):
+                known.pop(wire, None)
+            return eval_cone(defs, z, known | overrides)
+
+        suspects = near(defs, z, trusted, self.depth)
+        for a in suspects:
+            try:
+                zero = eval_with({a: 0})
+                one = eval_with({a: self.mask})
+            except CycleError:
+                continue
+            sensitive = zero ^ one
+            required = zero ^ self.expected[bit]
+            if required & ~sensitive:
+                continue
+            # When b also feeds z other than through a, z sees both changes.
+            feeding = cone(defs, z, a)
+            for b in others:
+                if a == b or b not in values:
+                    continue
+                if b not in feeding:
+                    if (values[b] ^ required) & sensitive == 0:
+                        yield a, b
+                elif b in suspects and a in values:
+                    try:
+                        if eval_with({a: values[b], b: values[a]}) == self.expected[bit]:
+                            yield a, b
+                    except CycleError:
+                        pass
+
+    def keeps(self, defs: dict[str, Evaluable], bit: int, values: dict[str, int], known: dict[str, int]) -> bool:
+        # Wires feeding the lower, correct bits do not depend on the swapped
+        # wires, so only the rest of the cones of z and of the next bit are
+        # re-evaluated: z must be fixed, and the next bit must not be broken,
+        # by a wrong value or by a cycle, if it was right before the swaps.
+        # A next bit that was already wrong may go through a cycle that a
+        # later swap breaks.
+        try:
+            if eval_cone(defs, f"z{bit:02}", dict(known)) != self.expected[bit]:
+                return False
+        except CycleError:
+            return False
+        if bit == self.nbits:
+            return True
+        next_z = f"z{bit + 1:02}"
+        if values.get(next_z) != self.expected[bit + 1]:
+            return True
+        try:
+            return eval_cone(defs, next_z, dict(known)) == self.expected[bit + 1]
+        except CycleError:
+            return False
+
+    def repair(self, defs: dict[str, Evaluable], max_swaps: int = 4) -> list[str] | None:
+        try:
+            bit, values = self.lowest_faulty_bit(defs)
+        except CycleError:
+            return None
+        if bit is None:
+            return []
+        if max_swaps == 0:
+            return None
+        z = f"z{bit:02}"
+        trusted = set()
+        for lower in range(bit):
+            trusted |= cone(defs, f"z{lower:02}")
+        known = {wire: word for wire, word in values.items() if wire in trusted} | self.words
+        others = sorted(wire for wire, d in defs.items() if isinstance(d, Gate) and wire not in trusted)
+        for a, b in self.fixing_swaps(defs, bit, values, trusted, others):
+            swap_wires(defs, a, b)
+            if self.keeps(defs, bit, values, known):
+                swapped = self.repair(defs, max_swaps - 1)
+                if swapped is not None:
+                    return [a, b] + swapped
+            swap_wires(defs, a, b)
+        if max_swaps < 2:
+            return None
+        # Two bad swaps may both feed z, so that undoing only one of them
+        # does not fix z: after each first swap near z, the second one is
+        # looked up as above. Only the wires that depend on the first swap
+        # are re-evaluated.
+        consumers = consumers_of(defs, others)
+        for a in near(defs, z, trusted, self.depth):
+            for b in others:
+                if a == b:
+                    continue
+                swap_wires(defs, a, b)
+                first_values = reevaluate(defs, values, consumers, (a, b))
+                if first_values.get(z) != self.expected[bit]:
+                    for c, d in self.fixing_swaps(defs, bit, first_values, trusted, others):
+                        if {c, d} & {a, b}:
+                            continue
+                        swap_wires(defs, c, d)
+                        if self.keeps(defs, bit, values, known):
+                            swapped = self.repair(defs, max_swaps - 2)
+                            if swapped is not None:
+                                return [a, b, c, d] + swapped
+                        swap_wires(defs, c, d)
+                swap_wires(defs, a, b)
+        return None
+
+def ripple_carry_adder(nbits: int) -> dict[str, Evaluable]:
+    defs = {}
+    for prefix in "xy":
+        for bit in range(nbits):
+            defs[f"{prefix}{bit:02}"] = InitialValue(f"{prefix}{bit:02}", False)
+
+    def gate(in0: str, op: Op, in1: str, out: str) -> None:
+        defs[out] = Gate(in0, op, in1, out)
+
+    gate("x00", Op.XOR, "y00", "z00")
+    gate("x00", Op.AND, "y00", "c00")
+    for bit in range(1, nbits):
+        x, y, carry = f"x{bit:02}", f"y{bit:02}", f"c{bit - 1:02}"
+        gate(x, Op.XOR, y, f"s{bit:02}")
+        gate(f"s{bit:02}", Op.XOR, carry, f"z{bit:02}")
+        gate(x, Op.AND, y, f"a{bit:02}")
+        gate(f"s{bit:02}", Op.AND, carry, f"b{bit:02}")
+        gate(f"a{bit:02}", Op.OR, f"b{bit:02}", f"z{nbits:02}" if bit == nbits - 1 else f"c{bit:02}")
+    return defs
+
+# Both swaps on bit 5 go to gates of bits 12 and 13, so that neither
+# one fixes z05 alone.
+adder = ripple_carry_adder(16)
+planted = [("z05", "s12"), ("c04", "a13"), ("s09", "a09"), ("z11", "b11")]
+for a, b in planted:
+    swap_wires(adder, a, b)
+assert sorted(AdderVerifier.create(adder).repair(dict(adder))) == sorted(wire for swap in planted for wire in swap)
+
+def verified_part2(defs):
+    verifier = AdderVerifier.create(defs)
+    candidate = dict(defs)
+    try:
+        answer = part2(candidate)
+        if verifier.lowest_faulty_bit(candidate)[0] is None:
+            return answer
+    except (AssertionError, CycleError, KeyError, ValueError):
+        pass
+    swapped = verifier.repair(dict(defs))
+    if swapped is None:
+        raise ValueError("the circuit cannot be repaired into an adder with four swaps")
     return ",".join(sorted(swapped))
 
 defs = parse()
-print(f"Part 1: {part1(defs)}")
+print(f"Part 1: {compiled_part1(defs)}")
 
-print(f"Part 2: {part2(defs)}")
+print(f"Part 2: {verified_part2(defs)}")